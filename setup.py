@@ -89,6 +89,7 @@ setup(
     zip_safe=False,
     license="MPL 2.0",
     install_requires=install_requires,
+    extras_require={"uvloop": ["uvloop"]},
     tests_require=tests_require,
     python_requires=">=3.7",
     cmdclass={"test": Tox},
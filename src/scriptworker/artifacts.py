@@ -43,7 +43,8 @@ _EXTENSION_TO_MIME_TYPE = {
 async def upload_artifacts(context, files):
     """Compress and upload the requested files from ``artifact_dir``, preserving relative paths.
 
-    Compression only occurs with files known to be supported.
+    Compression only occurs with files known to be supported. Uploads run
+    concurrently, bounded by ``context.upload_semaphore``.
 
     This function expects the directory structure in ``artifact_dir`` to remain
     the same.  So if we want the files in ``public/...``, create an
@@ -62,7 +63,10 @@ async def upload_artifacts(context, files):
         path = os.path.join(context.config["artifact_dir"], target_path)
         content_type, content_encoding = compress_artifact_if_supported(path)
         return asyncio.ensure_future(
-            retry_create_artifact(context, path, target_path=target_path, content_type=content_type, content_encoding=content_encoding)
+            semaphore_wrapper(
+                context.upload_semaphore,
+                retry_create_artifact(context, path, target_path=target_path, content_type=content_type, content_encoding=content_encoding),
+            )
         )
 
     tasks = list(map(to_upload_future, files))
@@ -67,6 +67,9 @@ DEFAULT_CONFIG: immutabledict[str, Any] = immutabledict(
         "task_log_dir": "...",  # set this to ARTIFACT_DIR/public/logs
         "artifact_upload_timeout": 60 * 20,
         "max_concurrent_downloads": 5,
+        "max_concurrent_uploads": 10,
+        # the long-lived aiohttp session's keep-alive, in seconds
+        "aiohttp_keepalive_timeout": 30,
         # chain of trust settings
         "sign_chain_of_trust": True,
         "verify_chain_of_trust": False,  # TODO True
@@ -76,6 +79,8 @@ DEFAULT_CONFIG: immutabledict[str, Any] = immutabledict(
         "cot_version": 3,
         "min_cot_version": 2,
         "max_chain_length": 20,
+        # number of verified cot signatures to remember across tasks; 0 disables
+        "cot_cache_size": 1000,
         # Calls to Github API are limited to 60 an hour. Using an API token allows to raise the limit to
         # 5000 per hour. https://developer.github.com/v3/#rate-limiting
         "github_oauth_token": "",
@@ -8,6 +8,7 @@ object, let's point to them from a single context object.
 Attributes:
     log (logging.Logger): the log object for the module.
     DEFAULT_MAX_CONCURRENT_DOWNLOADS (int): default max concurrent downloads
+    DEFAULT_MAX_CONCURRENT_UPLOADS (int): default max concurrent uploads
 
 """
 import asyncio
@@ -30,6 +31,7 @@ log = logging.getLogger(__name__)
 
 
 DEFAULT_MAX_CONCURRENT_DOWNLOADS = 5
+DEFAULT_MAX_CONCURRENT_UPLOADS = 10
 
 
 class Context(object):
@@ -39,10 +41,14 @@ class Context(object):
     passing around config and easier overriding in tests.
 
     Attributes:
+        claim_work_future (asyncio.Task): the ``claim_work`` call prefetched
+            while completing the previous task, if any.
         config (dict): the running config.  In production this will be an
             immutabledict.
         credentials_timestamp (int): the unix timestamp when we last updated
             our credentials.
+        draining (bool): True once the worker has been told to stop taking
+            new tasks, e.g. on SIGUSR1.
         proc (task_process.TaskProcess): when launching the script, this is
             the process object.
         queue (taskcluster.aio.Queue): the taskcluster Queue object
@@ -54,8 +60,10 @@ class Context(object):
 
     """
 
+    claim_work_future = None
     config: Optional[Dict[str, Any]] = None
     credentials_timestamp: Optional[int] = None
+    draining = False
     proc: Optional[task_process.TaskProcess] = None
     queue: Optional[Queue] = None
     session: Optional[aiohttp.ClientSession] = None
@@ -63,6 +71,7 @@ class Context(object):
     temp_queue: Optional[Queue] = None
     running_tasks = None
     _download_semaphore = None
+    _upload_semaphore = None
     _credentials: Optional[Dict[str, Any]] = None
     _claim_task: Optional[Dict[str, Any]] = None  # This assumes a single task per worker.
     _event_loop = None
@@ -257,3 +266,20 @@ class Context(object):
                 max_concurrent_downloads = DEFAULT_MAX_CONCURRENT_DOWNLOADS
             self._download_semaphore = asyncio.BoundedSemaphore(max_concurrent_downloads)
         return self._download_semaphore
+
+    @property
+    def upload_semaphore(self) -> asyncio.BoundedSemaphore:
+        """asyncio.BoundedSemaphore: limits the number of concurrent artifact uploads.
+
+        This keeps uploads from hogging every connection in ``self.session``,
+        which reclaimTask also needs.
+
+        """
+        assert self.config
+        if self._upload_semaphore is None:
+            try:
+                max_concurrent_uploads = self.config.get("max_concurrent_uploads", DEFAULT_MAX_CONCURRENT_UPLOADS)
+            except (TypeError, KeyError, AttributeError):
+                max_concurrent_uploads = DEFAULT_MAX_CONCURRENT_UPLOADS
+            self._upload_semaphore = asyncio.BoundedSemaphore(max_concurrent_uploads)
+        return self._upload_semaphore
@@ -8,6 +8,7 @@ Attributes:
 """
 import argparse
 import asyncio
+import functools
 import logging
 import os
 import pprint
@@ -26,6 +27,7 @@ from scriptworker.artifacts import download_artifacts, get_artifact_url, get_opt
 from scriptworker.config import apply_product_config, read_worker_creds
 from scriptworker.constants import DEFAULT_CONFIG
 from scriptworker.context import Context
+from scriptworker.cot.verify_cache import add_verified, get_cache_key, get_verified_key
 from scriptworker.ed25519 import ed25519_public_key_from_string, verify_ed25519_signature
 from scriptworker.exceptions import BaseDownloadError, CoTError, ScriptWorkerEd25519Error
 from scriptworker.github import GitHubRepository, extract_github_repo_full_name, extract_github_repo_owner_and_name, extract_github_repo_ssh_url
@@ -412,11 +414,26 @@ def guess_task_type(name, task_defn):
             task_type = "action"
         else:
             task_type = "decision"
-    if task_type not in get_valid_task_types():
+    if task_type not in _get_valid_task_type_names():
         raise CoTError("Invalid task type for {}!".format(name))
     return task_type
 
 
+# _get_valid_task_type_names {{{1
+@functools.lru_cache(maxsize=None)
+def _get_valid_task_type_names():
+    """Get the names of the valid task types.
+
+    ``guess_task_type`` runs for every ``ChainOfTrust`` and every ``LinkOfTrust``,
+    and only needs the names, so don't rebuild ``get_valid_task_types()`` each time.
+
+    Returns:
+        frozenset: the valid task type names.
+
+    """
+    return frozenset(get_valid_task_types())
+
+
 # get_valid_task_types {{{1
 def get_valid_task_types():
     """Get the valid task types, e.g. signing.
@@ -837,27 +854,34 @@ def verify_link_ed25519_cot_signature(chain, link, unsigned_path, signature_path
         binary_contents = read_from_file(unsigned_path, file_type="binary", exception=CoTError)
         errors = []
         verify_key_seeds = chain.context.config["ed25519_public_keys"].get(link.worker_impl, [])
-        for seed in verify_key_seeds:
-            try:
-                verify_key = ed25519_public_key_from_string(seed)
-                verify_ed25519_signature(
-                    verify_key,
-                    binary_contents,
-                    signature,
-                    "{} {}: {} ed25519 cot signature doesn't verify against {}: %(exc)s".format(link.name, link.task_id, link.worker_impl, seed),
-                )
-                log.debug("{} {}: ed25519 cot signature verified.".format(link.name, link.task_id))
-                break
-            except ScriptWorkerEd25519Error as exc:
-                errors.append(str(exc))
+        cache_size = chain.context.config["cot_cache_size"]
+        cache_key = get_cache_key(link.task_id, binary_contents) if cache_size > 0 else None
+        if cache_key is not None and get_verified_key(cache_key) in verify_key_seeds:
+            log.debug("{} {}: ed25519 cot signature already verified.".format(link.name, link.task_id))
         else:
-            errors = errors or [
-                "{} {}: Unknown error verifying ed25519 cot signature. worker_impl {} verify_keys {}".format(
-                    link.name, link.task_id, link.worker_impl, verify_key_seeds
-                )
-            ]
-            message = "\n".join(errors)
-            raise CoTError(message)
+            for seed in verify_key_seeds:
+                try:
+                    verify_key = ed25519_public_key_from_string(seed)
+                    verify_ed25519_signature(
+                        verify_key,
+                        binary_contents,
+                        signature,
+                        "{} {}: {} ed25519 cot signature doesn't verify against {}: %(exc)s".format(link.name, link.task_id, link.worker_impl, seed),
+                    )
+                    log.debug("{} {}: ed25519 cot signature verified.".format(link.name, link.task_id))
+                    if cache_key is not None:
+                        add_verified(cache_key, seed, cache_size)
+                    break
+                except ScriptWorkerEd25519Error as exc:
+                    errors.append(str(exc))
+            else:
+                errors = errors or [
+                    "{} {}: Unknown error verifying ed25519 cot signature. worker_impl {} verify_keys {}".format(
+                        link.name, link.task_id, link.worker_impl, verify_key_seeds
+                    )
+                ]
+                message = "\n".join(errors)
+                raise CoTError(message)
     link.cot = load_json_or_yaml(
         unsigned_path, is_path=True, exception=CoTError, message="{} {}: Invalid unsigned cot json body! %(exc)s".format(link.name, link.task_id)
     )
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Chain of Trust verification cache.
+
+Sibling tasks in a graph tend to share the same upstream tasks (decision,
+docker-image, toolchain tasks), so we'd otherwise verify the same chain of
+trust signatures over and over.  Remember which ``(task_id, sha256)`` pairs
+have already verified, and which public key verified them.
+
+Only successful verifications are cached; failures are always re-verified.
+A doorkeeper set of key fingerprints sits in front of the LRU, so an artifact
+is only admitted the second time it verifies.  One-off upstream tasks then
+don't evict the ones that are actually shared.
+
+Attributes:
+    log (logging.Logger): the log object for the module.
+
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+_VERIFIED: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_SEEN: Set[int] = set()
+
+
+def get_cache_key(task_id: str, contents: bytes) -> Tuple[str, str]:
+    """Get the verification cache key for a chain of trust artifact.
+
+    Args:
+        task_id (str): the taskId of the task that produced the artifact.
+        contents (bytes): the contents of the artifact.
+
+    Returns:
+        tuple: ``(task_id, sha256_hexdigest)``
+
+    """
+    return (task_id, hashlib.sha256(contents).hexdigest())
+
+
+def get_verified_key(cache_key: Tuple[str, str]) -> Optional[str]:
+    """Get the public key that previously verified ``cache_key``, if any.
+
+    Args:
+        cache_key (tuple): the key from ``get_cache_key``.
+
+    Returns:
+        str: the public key string that verified this artifact, or None if
+            it hasn't been verified yet.
+
+    """
+    verify_key = _VERIFIED.get(cache_key)
+    if verify_key is not None:
+        _VERIFIED.move_to_end(cache_key)
+    return verify_key
+
+
+def add_verified(cache_key: Tuple[str, str], verify_key: str, maxsize: int) -> None:
+    """Record a successful verification, evicting the least recently used entries.
+
+    The first sighting of ``cache_key`` only marks it as seen; it's added to
+    the LRU on the second.  The doorkeeper is reset once it holds ``maxsize``
+    fingerprints.  A fingerprint collision just admits a key early.
+
+    Args:
+        cache_key (tuple): the key from ``get_cache_key``.
+        verify_key (str): the public key string that verified the artifact.
+        maxsize (int): the maximum number of entries to keep. 0 disables
+            the cache.
+
+    """
+    if maxsize <= 0:
+        return
+    if cache_key not in _VERIFIED:
+        fingerprint = hash(cache_key)
+        if fingerprint not in _SEEN:
+            if len(_SEEN) >= maxsize:
+                _SEEN.clear()
+            _SEEN.add(fingerprint)
+            return
+        _SEEN.discard(fingerprint)
+    _VERIFIED[cache_key] = verify_key
+    _VERIFIED.move_to_end(cache_key)
+    while len(_VERIFIED) > maxsize:
+        _VERIFIED.popitem(last=False)
+
+
+def clear_verify_cache() -> None:
+    """Forget all cached verifications."""
+    _VERIFIED.clear()
+    _SEEN.clear()
@@ -39,7 +39,7 @@ REPO_SCOPE_REGEX = re.compile("^assume:repo:[^:]+:action:[^:]+$")
 
 
 # worst_level {{{1
-def worst_level(level1, level2):
+def worst_level(level1: int, level2: int) -> int:
     """Given two int levels, return the larger.
 
     Args:
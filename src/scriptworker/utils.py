@@ -6,6 +6,7 @@ Attributes:
 
 """
 import asyncio
+import datetime
 import functools
 import hashlib
 import json
@@ -119,6 +120,27 @@ def datestring_to_timestamp(datestring):
     return arrow.get(datestring).int_timestamp
 
 
+# iso_now {{{1
+_ISO_NOW_CACHE: Tuple[int, str] = (-1, "")
+
+
+def iso_now() -> str:
+    """Get the current UTC time as an ISO 8601 string, to the second.
+
+    The string is cached until the second rolls over, so repeated calls
+    (e.g. in log messages) don't reformat it.
+
+    Returns:
+        str: the current time, like "2016-04-16T03:46:24+00:00"
+
+    """
+    global _ISO_NOW_CACHE
+    now = int(time.time())
+    if _ISO_NOW_CACHE[0] != now:
+        _ISO_NOW_CACHE = (now, datetime.datetime.fromtimestamp(now, datetime.timezone.utc).isoformat())
+    return _ISO_NOW_CACHE[1]
+
+
 # to_unicode {{{1
 def to_unicode(line: Union[str, bytes]) -> str:
     """Avoid ``b'line'`` type messages in the logs.
@@ -6,6 +6,8 @@ Attributes:
 
 """
 import asyncio
+import contextvars
+import functools
 import logging
 import os
 import signal
@@ -15,22 +17,82 @@ import typing
 from typing import Any
 
 import aiohttp
-import arrow
 
 from scriptworker.artifacts import upload_artifacts
 from scriptworker.config import get_context_from_cmdln
 from scriptworker.constants import STATUSES
 from scriptworker.cot.generate import generate_cot
 from scriptworker.cot.verify import ChainOfTrust, verify_chain_of_trust
+from scriptworker.cot.verify_cache import clear_verify_cache
 from scriptworker.exceptions import ScriptWorkerException, WorkerShutdownDuringTask
 from scriptworker.task import claim_work, complete_task, prepare_to_run_task, reclaim_task, run_task, worst_level
 from scriptworker.task_process import TaskProcess
-from scriptworker.utils import cleanup, filepaths_in_dir
+from scriptworker.utils import cleanup, filepaths_in_dir, iso_now
 
 log = logging.getLogger(__name__)
 
 
+# _catch_sw_errors {{{1
+_partial_status: "contextvars.ContextVar[int]" = contextvars.ContextVar("_partial_status", default=0)
+
+
+_StatusCoroutineFunction = typing.Callable[..., typing.Awaitable[int]]
+
+
+def _catch_sw_errors(
+    name: str,
+    intermittent: typing.Tuple[typing.Type[Exception], ...] = (),
+    unexpected_status: typing.Optional[int] = None,
+    on_cancel: typing.Optional[typing.Type[BaseException]] = None,
+) -> typing.Callable[[_StatusCoroutineFunction], _StatusCoroutineFunction]:
+    """Turn exceptions from the decorated coroutine into an exit status.
+
+    The decorated coroutine returns its status.  It can record a status with
+    ``_partial_status.set()`` so it's still accounted for if it raises later.
+
+    Args:
+        name (str): what we were doing, for the unexpected exception log.
+        intermittent (tuple, optional): exception classes that mean
+            ``intermittent-task``. Defaults to ().
+        unexpected_status (int, optional): the status to return on any other
+            exception. If None, re-raise it. Defaults to None.
+        on_cancel (type, optional): the exception class to raise instead of
+            ``asyncio.CancelledError``. If None, re-raise it. Defaults to None.
+
+    """
+
+    def wrap(func: _StatusCoroutineFunction) -> _StatusCoroutineFunction:
+        @functools.wraps(func)
+        async def wrapped(*args: Any, **kwargs: Any) -> int:
+            token = _partial_status.set(0)
+            try:
+                return await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                if on_cancel is None:
+                    raise
+                log.info("%s cancelled asynchronously", name)
+                raise on_cancel
+            except ScriptWorkerException as e:
+                log.error("Hit ScriptWorkerException: %s", e)
+                return worst_level(_partial_status.get(), e.exit_code)
+            except intermittent as e:
+                log.error("Hit %s: %s", type(e), e)
+                return worst_level(_partial_status.get(), STATUSES["intermittent-task"])
+            except Exception as e:
+                log.exception("SCRIPTWORKER_UNEXPECTED_EXCEPTION %s %s", name, e)
+                if unexpected_status is None:
+                    raise
+                return unexpected_status
+            finally:
+                _partial_status.reset(token)
+
+        return wrapped
+
+    return wrap
+
+
 # do_run_task {{{1
+@_catch_sw_errors("task", unexpected_status=STATUSES["internal-error"], on_cancel=WorkerShutdownDuringTask)
 async def do_run_task(context, run_cancellable, to_cancellable_process):
     """Run the task logic.
 
@@ -43,32 +105,23 @@ async def do_run_task(context, run_cancellable, to_cancellable_process):
             down
 
     Raises:
-        Exception: on unexpected exception.
+        WorkerShutdownDuringTask: if the worker is shut down mid-task.
 
     Returns:
         int: exit status
 
     """
-    status = 0
-    try:
-        if context.config["verify_chain_of_trust"]:
-            chain = ChainOfTrust(context, context.config["cot_job_type"])
-            await run_cancellable(verify_chain_of_trust(chain))
-        status = await run_task(context, to_cancellable_process)
-        generate_cot(context)
-    except asyncio.CancelledError:
-        log.info("CoT cancelled asynchronously")
-        raise WorkerShutdownDuringTask
-    except ScriptWorkerException as e:
-        status = worst_level(status, e.exit_code)
-        log.error("Hit ScriptWorkerException: {}".format(e))
-    except Exception as e:
-        log.exception("SCRIPTWORKER_UNEXPECTED_EXCEPTION task {}".format(e))
-        status = STATUSES["internal-error"]
+    if context.config["verify_chain_of_trust"]:
+        chain = ChainOfTrust(context, context.config["cot_job_type"])
+        await run_cancellable(verify_chain_of_trust(chain))
+    status = await run_task(context, to_cancellable_process)
+    _partial_status.set(status)
+    generate_cot(context)
     return status
 
 
 # do_upload {{{1
+@_catch_sw_errors("upload", intermittent=(aiohttp.ClientError, asyncio.TimeoutError))
 async def do_upload(context, files):
     """Upload artifacts and return status.
 
@@ -85,24 +138,56 @@ async def do_upload(context, files):
         int: exit status
 
     """
-    status = 0
-    try:
-        await upload_artifacts(context, files)
-    except ScriptWorkerException as e:
-        status = worst_level(status, e.exit_code)
-        log.error("Hit ScriptWorkerException: {}".format(e))
-    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-        status = worst_level(status, STATUSES["intermittent-task"])
-        log.error("Hit {}: {}".format(type(e), e))
-    except Exception as e:
-        log.exception("SCRIPTWORKER_UNEXPECTED_EXCEPTION upload {}".format(e))
-        raise
-    return status
+    await upload_artifacts(context, files)
+    return 0
+
+
+# claim_work helpers {{{1
+async def _claim_work(context):
+    """Claim work, reusing the ``claim_work`` call prefetched by the last task if any.
+
+    Args:
+        context (scriptworker.context.Context): the scriptworker context.
+
+    Returns:
+        dict: the ``claim_work`` response.
+
+    """
+    future = context.claim_work_future
+    if future is None:
+        return await claim_work(context)
+    context.claim_work_future = None
+    return await future
+
+
+async def release_prefetched_claim(context):
+    """Report any tasks from a prefetched ``claim_work`` as ``worker-shutdown``.
+
+    We prefetch the next ``claim_work`` while completing the current task. If
+    the worker stops before running those tasks, hand them back to the queue
+    so they're rerun rather than left to expire.
+
+    Args:
+        context (scriptworker.context.Context): the scriptworker context.
+
+    """
+    future = context.claim_work_future
+    if future is None:
+        return
+    context.claim_work_future = None
+    tasks = await future
+    for task_defn in (tasks or {}).get("tasks", []):
+        context.claim_task = task_defn
+        log.warning("Worker is shutting down; releasing prefetched taskId %s", context.task_id)
+        await complete_task(context, STATUSES["worker-shutdown"])
+    context.claim_task = None
 
 
 class RunTasks:
     """Manages processing of Taskcluster tasks."""
 
+    __slots__ = ("future", "task_process", "is_cancelled")
+
     def __init__(self):
         """Constructor."""
         self.future = None
@@ -121,8 +206,9 @@ class RunTasks:
         try:
             # Note: claim_work(...) might not be safely interruptible! See
             # https://bugzilla.mozilla.org/show_bug.cgi?id=1524069
-            tasks = await self._run_cancellable(claim_work(context))
-            if not tasks or not tasks.get("tasks", []):
+            tasks = await self._run_cancellable(_claim_work(context))
+            task_list = (tasks or {}).get("tasks") or ()
+            if not task_list:
                 await self._run_cancellable(asyncio.sleep(context.config["poll_interval"]))
                 return None
 
@@ -130,20 +216,27 @@ class RunTasks:
             # run them sequentially.  A side effect is our return status will
             # be the status of the final task run.
             status = None
-            for task_defn in tasks.get("tasks", []):
+            for task_defn in task_list:
                 prepare_to_run_task(context, task_defn)
                 reclaim_fut = context.event_loop.create_task(reclaim_task(context, context.task))
                 try:
-                    status = await do_run_task(context, self._run_cancellable, self._to_cancellable_process)
-                    artifacts_paths = filepaths_in_dir(context.config["artifact_dir"])
-                except WorkerShutdownDuringTask:
-                    shutdown_artifact_paths = [os.path.join("public", "logs", log_file) for log_file in ["chain_of_trust.log", "live_backing.log"]]
-                    artifacts_paths = [path for path in shutdown_artifact_paths if os.path.isfile(os.path.join(context.config["artifact_dir"], path))]
-                    status = STATUSES["worker-shutdown"]
-                status = worst_level(status, await do_upload(context, artifacts_paths))
-                await complete_task(context, status)
-                reclaim_fut.cancel()
-                cleanup(context)
+                    try:
+                        status = await do_run_task(context, self._run_cancellable, self._to_cancellable_process)
+                        artifacts_paths = filepaths_in_dir(context.config["artifact_dir"])
+                    except WorkerShutdownDuringTask:
+                        shutdown_artifact_paths = [os.path.join("public", "logs", log_file) for log_file in ["chain_of_trust.log", "live_backing.log"]]
+                        artifacts_paths = [path for path in shutdown_artifact_paths if os.path.isfile(os.path.join(context.config["artifact_dir"], path))]
+                        status = STATUSES["worker-shutdown"]
+                    status = worst_level(status, await do_upload(context, artifacts_paths))
+                    if not (self.is_cancelled or context.draining) and context.claim_work_future is None:
+                        # Overlap the next claimWork round trip with reporting this task
+                        context.claim_work_future = context.event_loop.create_task(claim_work(context))
+                    await complete_task(context, status)
+                finally:
+                    # Stop reclaiming even if the upload or report blew up
+                    reclaim_fut.cancel()
+                # rm -rf of the work dirs can be slow; keep the event loop responsive
+                await context.event_loop.run_in_executor(None, cleanup, context)
 
             return status
 
@@ -151,12 +244,20 @@ class RunTasks:
             return None
 
     async def _run_cancellable(self, coroutine: typing.Awaitable[Any]) -> Any:
-        self.future = asyncio.ensure_future(coroutine)
         if self.is_cancelled:
+            self.future = asyncio.ensure_future(coroutine)
             self.future.cancel()
-        result = await self.future
-        self.future = None
-        return result
+            awaitable = self.future
+        else:
+            # Await ``coroutine`` directly rather than wrapping it in a new Task;
+            # ``cancel`` cancels the current task, which interrupts ``coroutine``
+            # the same way.
+            self.future = asyncio.current_task()
+            awaitable = coroutine
+        try:
+            return await awaitable
+        finally:
+            self.future = None
 
     async def _to_cancellable_process(self, task_process: TaskProcess) -> TaskProcess:
         self.task_process = task_process
@@ -205,56 +306,127 @@ async def run_tasks(context):
 async def async_main(context, credentials):
     """Set up and run tasks for this iteration.
 
+    ``context.session`` is owned by ``main`` and reused across iterations, so
+    we don't pay for fresh TCP/TLS handshakes on every poll.
+
     https://firefox-ci-tc.services.mozilla.com/docs/reference/platform/queue/worker-interaction
 
     Args:
         context (scriptworker.context.Context): the scriptworker context.
+        credentials (dict): the scriptworker credentials.
     """
-    async with aiohttp.ClientSession() as session:
-        context.session = session
+    # ``credentials`` doesn't change for the life of ``main``, so only build
+    # ``context.queue`` once.
+    if context.queue is None:
         context.credentials = credentials
-        await run_tasks(context)
+    await run_tasks(context)
+
+
+# main_loop {{{1
+async def main_loop(context, credentials, is_done):
+    """Create the long-lived aiohttp session and loop over ``async_main``.
+
+    Args:
+        context (scriptworker.context.Context): the scriptworker context.
+        credentials (dict): the scriptworker credentials.
+        is_done (typing.Callable): returns True when the worker should stop
+            taking new tasks.
+
+    """
+    # Concurrency is bounded by ``max_concurrent_downloads`` and
+    # ``max_concurrent_uploads``, so leave the connector at aiohttp's default limit.
+    connector = aiohttp.TCPConnector(keepalive_timeout=context.config["aiohttp_keepalive_timeout"], enable_cleanup_closed=True)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        context.session = session
+        try:
+            while not is_done():
+                await async_main(context, credentials)
+        finally:
+            # Hand back a prefetched claim even if we're bailing out on an
+            # exception, without masking that exception.
+            try:
+                await release_prefetched_claim(context)
+            except Exception:
+                log.exception("Failed to release the prefetched claim")
+            context.session = None
 
 
 # main {{{1
+def _set_uvloop_policy():
+    """Use ``uvloop`` for new event loops, if it's installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    log.debug("Using uvloop")
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+async def _shutdown_event_loop(event_loop, pending=()):
+    """Wind down the event loop we own, like ``asyncio.run`` does.
+
+    Args:
+        event_loop (asyncio.AbstractEventLoop): the event loop.
+        pending (iterable, optional): tasks to let finish first, e.g. signal
+            handlers. Defaults to ().
+
+    """
+    await asyncio.gather(*pending, return_exceptions=True)
+    await event_loop.shutdown_asyncgens()
+    # python 3.9+
+    if hasattr(event_loop, "shutdown_default_executor"):
+        await event_loop.shutdown_default_executor()
+
+
 def main(event_loop=None):
     """Scriptworker entry point: get everything set up, then enter the main loop.
 
     Args:
         event_loop (asyncio.BaseEventLoop, optional): the event loop to use.
-            If None, use ``asyncio.get_event_loop()``. Defaults to None.
+            If None, use ``asyncio.get_event_loop()``, which is a ``uvloop``
+            loop if ``uvloop`` is installed. Defaults to None.
 
     """
     context, credentials = get_context_from_cmdln(sys.argv[1:])
-    log.info("Scriptworker starting up at {} UTC".format(arrow.utcnow().format()))
-    log.info("Worker FQDN: {}".format(socket.getfqdn()))
+    log.info("Scriptworker starting up at %s UTC", iso_now())
+    log.info("Worker FQDN: %s", socket.getfqdn())
     cleanup(context)
+    clear_verify_cache()
+    if event_loop is None:
+        _set_uvloop_policy()
     context.event_loop = event_loop or asyncio.get_event_loop()
 
-    done = False
+    signal_tasks = {}
 
-    async def _handle_sigterm():
-        log.info("SIGTERM received; shutting down")
-        nonlocal done
-        done = True
+    async def _handle_sigterm(signame):
+        log.info("%s received; shutting down", signame)
+        context.draining = True
         if context.running_tasks is not None:
             await context.running_tasks.cancel()
 
     async def _handle_sigusr1():
         """Stop accepting new tasks."""
         log.info("SIGUSR1 received; no more tasks will be taken")
-        nonlocal done
-        done = True
+        context.draining = True
 
-    context.event_loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(_handle_sigterm()))
-    context.event_loop.add_signal_handler(signal.SIGUSR1, lambda: asyncio.ensure_future(_handle_sigusr1()))
+    def _schedule(handler, *args):
+        # Hold a reference so the handler task isn't garbage collected while
+        # the loop winds down, and only run each handler once.
+        if handler not in signal_tasks:
+            signal_tasks[handler] = context.event_loop.create_task(handler(*args))
 
-    while not done:
-        try:
-            context.event_loop.run_until_complete(async_main(context, credentials))
-        except Exception:
-            log.critical("Fatal exception", exc_info=1)
-            raise
+    context.event_loop.add_signal_handler(signal.SIGTERM, _schedule, _handle_sigterm, "SIGTERM")
+    context.event_loop.add_signal_handler(signal.SIGINT, _schedule, _handle_sigterm, "SIGINT")
+    context.event_loop.add_signal_handler(signal.SIGUSR1, _schedule, _handle_sigusr1)
+
+    try:
+        context.event_loop.run_until_complete(main_loop(context, credentials, lambda: context.draining))
+    except Exception:
+        log.critical("Fatal exception", exc_info=1)
+        raise
     else:
-        log.info("Scriptworker stopped at {} UTC".format(arrow.utcnow().format()))
-        log.info("Worker FQDN: {}".format(socket.getfqdn()))
+        log.info("Scriptworker stopped at %s UTC", iso_now())
+        log.info("Worker FQDN: %s", socket.getfqdn())
+    finally:
+        if event_loop is None:
+            context.event_loop.run_until_complete(_shutdown_event_loop(context.event_loop, signal_tasks.values()))
@@ -84,6 +84,25 @@ async def test_upload_artifacts(context):
     assert create_artifact_paths == [os.path.join(context.config["artifact_dir"], "one"), os.path.join(context.config["artifact_dir"], "public/two")]
 
 
+@pytest.mark.asyncio
+async def test_upload_artifacts_concurrency(context):
+    context.config["max_concurrent_uploads"] = 2
+    running = 0
+    max_running = 0
+
+    async def foo(*args, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    with mock.patch("scriptworker.artifacts.create_artifact", new=foo):
+        await upload_artifacts(context, ["one", "two", "three", "four", "five"])
+
+    assert max_running == 2
+
+
 @pytest.mark.asyncio
 async def test_upload_artifacts_throws(context, mocker):
     exceptions = [None, ArithmeticError]
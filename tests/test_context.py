@@ -159,3 +159,13 @@ async def test_download_semaphore():
     assert type(sem) == asyncio.BoundedSemaphore
     assert sem._value == swcontext.DEFAULT_MAX_CONCURRENT_DOWNLOADS
     assert sem is context.download_semaphore
+
+
+@pytest.mark.asyncio
+async def test_upload_semaphore():
+    context = swcontext.Context()
+    context.config = {"foo": "bar"}
+    sem = context.upload_semaphore
+    assert type(sem) == asyncio.BoundedSemaphore
+    assert sem._value == swcontext.DEFAULT_MAX_CONCURRENT_UPLOADS
+    assert sem is context.upload_semaphore
@@ -18,6 +18,7 @@ from immutabledict import immutabledict
 import scriptworker.context as swcontext
 import scriptworker.cot.verify as cotverify
 from scriptworker.artifacts import get_single_upstream_artifact_full_path
+from scriptworker.cot.verify_cache import clear_verify_cache
 from scriptworker.exceptions import CoTError, DownloadError
 from scriptworker.utils import load_json_or_yaml, makedirs, read_from_file
 
@@ -931,6 +932,55 @@ def test_verify_link_ed25519_cot_signature(chain, build_link, mocker, unsigned_p
         assert build_link.cot == contents
 
 
+def test_verify_link_ed25519_cot_signature_cached(chain, build_link, mocker):
+    unsigned_path = os.path.join(ED25519_DIR, "foo.json")
+    signature_path = os.path.join(ED25519_DIR, "foo.json.scriptworker.sig")
+    chain.context.config["verify_cot_signature"] = True
+    chain.context.config["ed25519_public_keys"][build_link.worker_impl] = [read_from_file(os.path.join(ED25519_DIR, "scriptworker_public_key"))]
+    build_link._cot = None
+    build_link.task_id = None
+    clear_verify_cache()
+    verify_sig = mocker.spy(cotverify, "verify_ed25519_signature")
+    try:
+        # verified on the first two sightings, cached on the third
+        for _ in range(3):
+            build_link._cot = None
+            cotverify.verify_link_ed25519_cot_signature(chain, build_link, unsigned_path, signature_path)
+        assert verify_sig.call_count == 2
+        assert build_link.cot == load_json_or_yaml(unsigned_path, is_path=True)
+        build_link._cot = None
+        # During a key rotation the cached key needn't be first
+        scriptworker_key = read_from_file(os.path.join(ED25519_DIR, "scriptworker_public_key"))
+        docker_worker_key = read_from_file(os.path.join(ED25519_DIR, "docker-worker_public_key"))
+        chain.context.config["ed25519_public_keys"][build_link.worker_impl] = [docker_worker_key, scriptworker_key]
+        cotverify.verify_link_ed25519_cot_signature(chain, build_link, unsigned_path, signature_path)
+        assert verify_sig.call_count == 2
+        build_link._cot = None
+        # A different trusted key means we need to verify again
+        chain.context.config["ed25519_public_keys"][build_link.worker_impl] = [read_from_file(os.path.join(ED25519_DIR, "docker-worker_public_key"))]
+        with pytest.raises(CoTError):
+            cotverify.verify_link_ed25519_cot_signature(chain, build_link, unsigned_path, signature_path)
+    finally:
+        clear_verify_cache()
+
+
+def test_verify_link_ed25519_cot_signature_cache_disabled(chain, build_link, mocker):
+    unsigned_path = os.path.join(ED25519_DIR, "foo.json")
+    signature_path = os.path.join(ED25519_DIR, "foo.json.scriptworker.sig")
+    chain.context.config["verify_cot_signature"] = True
+    chain.context.config["cot_cache_size"] = 0
+    chain.context.config["ed25519_public_keys"][build_link.worker_impl] = [read_from_file(os.path.join(ED25519_DIR, "scriptworker_public_key"))]
+    build_link._cot = None
+    build_link.task_id = None
+    get_cache_key = mocker.spy(cotverify, "get_cache_key")
+    verify_sig = mocker.spy(cotverify, "verify_ed25519_signature")
+    for _ in range(3):
+        build_link._cot = None
+        cotverify.verify_link_ed25519_cot_signature(chain, build_link, unsigned_path, signature_path)
+    get_cache_key.assert_not_called()
+    assert verify_sig.call_count == 3
+
+
 # verify_cot_signatures {{{1
 @pytest.mark.parametrize("ed25519_mock, raises", ((noop_sync, False), (die_sync, True)))
 def test_verify_link_cot_signature_bad_sig(chain, mocker, build_link, ed25519_mock, raises):
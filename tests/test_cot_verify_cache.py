@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Test scriptworker.cot.verify_cache
+"""
+import hashlib
+
+import pytest
+
+import scriptworker.cot.verify_cache as verify_cache
+
+
+@pytest.yield_fixture(scope="function", autouse=True)
+def clear_cache():
+    verify_cache.clear_verify_cache()
+    yield
+    verify_cache.clear_verify_cache()
+
+
+# get_cache_key {{{1
+def test_get_cache_key():
+    assert verify_cache.get_cache_key("taskId", b"foo") == ("taskId", hashlib.sha256(b"foo").hexdigest())
+    assert verify_cache.get_cache_key("taskId", b"foo") != verify_cache.get_cache_key("taskId", b"bar")
+    assert verify_cache.get_cache_key("taskId", b"foo") != verify_cache.get_cache_key("otherTaskId", b"foo")
+
+
+# add_verified get_verified_key {{{1
+def test_add_verified():
+    key = verify_cache.get_cache_key("taskId", b"foo")
+    assert verify_cache.get_verified_key(key) is None
+    # the first sighting only goes into the doorkeeper
+    verify_cache.add_verified(key, "pubkey", 10)
+    assert verify_cache.get_verified_key(key) is None
+    verify_cache.add_verified(key, "pubkey", 10)
+    assert verify_cache.get_verified_key(key) == "pubkey"
+    verify_cache.clear_verify_cache()
+    assert verify_cache.get_verified_key(key) is None
+
+
+def test_add_verified_lru():
+    keys = [verify_cache.get_cache_key(str(i), b"foo") for i in range(3)]
+    for _ in range(2):
+        verify_cache.add_verified(keys[0], "pubkey", 2)
+        verify_cache.add_verified(keys[1], "pubkey", 2)
+    # touch keys[0] so keys[1] is the least recently used
+    assert verify_cache.get_verified_key(keys[0]) == "pubkey"
+    for _ in range(2):
+        verify_cache.add_verified(keys[2], "pubkey", 2)
+    assert verify_cache.get_verified_key(keys[0]) == "pubkey"
+    assert verify_cache.get_verified_key(keys[1]) is None
+    assert verify_cache.get_verified_key(keys[2]) == "pubkey"
+
+
+def test_add_verified_disabled():
+    key = verify_cache.get_cache_key("taskId", b"foo")
+    for _ in range(2):
+        verify_cache.add_verified(key, "pubkey", 0)
+    assert verify_cache.get_verified_key(key) is None
+
+
+def test_doorkeeper_reset():
+    keys = [verify_cache.get_cache_key(str(i), b"foo") for i in range(3)]
+    for key in keys:
+        verify_cache.add_verified(key, "pubkey", 2)
+    # the doorkeeper was full when keys[2] arrived, so keys[0] was forgotten
+    verify_cache.add_verified(keys[0], "pubkey", 2)
+    assert verify_cache.get_verified_key(keys[0]) is None
+    verify_cache.add_verified(keys[2], "pubkey", 2)
+    assert verify_cache.get_verified_key(keys[2]) == "pubkey"
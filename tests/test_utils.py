@@ -81,6 +81,19 @@ def test_datestring_to_timestamp(datestring):
     assert utils.datestring_to_timestamp(datestring) == 1460778384
 
 
+# iso_now {{{1
+def test_iso_now(mocker):
+    mocker.patch.object(time, "time", return_value=1460778384.5)
+    assert utils.iso_now() == "2016-04-16T03:46:24+00:00"
+    with mock.patch("datetime.datetime") as mock_datetime:
+        # cached for the rest of the second
+        mocker.patch.object(time, "time", return_value=1460778384.9)
+        assert utils.iso_now() == "2016-04-16T03:46:24+00:00"
+        mock_datetime.fromtimestamp.assert_not_called()
+    mocker.patch.object(time, "time", return_value=1460778385.1)
+    assert utils.iso_now() == "2016-04-16T03:46:25+00:00"
+
+
 # cleanup {{{1
 def test_cleanup(rw_context):
     for name in "work_dir", "artifact_dir", "task_log_dir":
@@ -8,6 +8,7 @@ import os
 import signal
 import sys
 import tempfile
+import threading
 from copy import deepcopy
 
 import aiohttp
@@ -56,23 +57,28 @@ def test_main(mocker, context, event_loop):
 
 
 @pytest.mark.parametrize("running", (True, False))
-def test_main_running_sigterm(mocker, context, event_loop, running):
-    """Test that sending SIGTERM causes the main loop to stop after the next
-    call to async_main."""
-    run_tasks_cancelled = event_loop.create_future()
+@pytest.mark.parametrize("signum, other_signum", ((signal.SIGTERM, signal.SIGINT), (signal.SIGINT, signal.SIGTERM)))
+def test_main_running_sigterm(mocker, context, event_loop, running, signum, other_signum):
+    """Test that sending SIGTERM or SIGINT causes the main loop to stop after
+    the next call to async_main."""
+    cancel_calls = []
 
     class MockRunTasks:
         @staticmethod
-        def cancel():
-            run_tasks_cancelled.set_result(True)
+        async def cancel():
+            # only called once, even if we get the signal more than once
+            cancel_calls.append(True)
 
     async def async_main(internal_context, _):
         # scriptworker reads context from a file, so we have to modify the context given here instead of the variable
         # from the fixture
         if running:
             internal_context.running_tasks = MockRunTasks()
-        # Send SIGTERM to ourselves so that we stop
-        os.kill(os.getpid(), signal.SIGTERM)
+        # Send the signals to ourselves so that we stop
+        for sig in (signum, signum, other_signum):
+            os.kill(os.getpid(), sig)
+        # Yield to the event loop so the signal handlers can run
+        await asyncio.sleep(0)
 
     _, tmp = tempfile.mkstemp()
     try:
@@ -84,9 +90,7 @@ def test_main_running_sigterm(mocker, context, event_loop, running):
     finally:
         os.remove(tmp)
 
-    if running:
-        event_loop.run_until_complete(run_tasks_cancelled)
-        assert run_tasks_cancelled.result()
+    assert cancel_calls == ([True] if running else [])
 
 
 @pytest.mark.parametrize("running", (True, False))
@@ -107,6 +111,8 @@ def test_main_running_sigusr1(mocker, context, event_loop, running):
             internal_context.running_tasks = MockRunTasks()
         # Send SIGUSR1 to ourselves so that we stop
         os.kill(os.getpid(), signal.SIGUSR1)
+        # Yield to the event loop so the signal handler can run
+        await asyncio.sleep(0)
 
     _, tmp = tempfile.mkstemp()
     try:
@@ -121,6 +127,41 @@ def test_main_running_sigusr1(mocker, context, event_loop, running):
     assert not run_tasks_cancelled.done()
 
 
+@pytest.mark.parametrize("installed", (True, False))
+def test_set_uvloop_policy(mocker, installed):
+    fake_uvloop = mock.MagicMock() if installed else None
+    mocker.patch.dict(sys.modules, {"uvloop": fake_uvloop})
+    set_policy = mocker.patch.object(asyncio, "set_event_loop_policy")
+    worker._set_uvloop_policy()
+    if installed:
+        set_policy.assert_called_once_with(fake_uvloop.EventLoopPolicy.return_value)
+    else:
+        set_policy.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_event_loop():
+    finished = []
+
+    async def agen():
+        try:
+            yield 1
+            yield 2
+        finally:
+            finished.append("agen")
+
+    async def handler():
+        await asyncio.sleep(0)
+        finished.append("handler")
+
+    gen = agen()
+    await gen.__anext__()
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, lambda: None)
+    await worker._shutdown_event_loop(loop, [asyncio.ensure_future(handler())])
+    assert sorted(finished) == ["agen", "handler"]
+
+
 # async_main {{{1
 @pytest.mark.asyncio
 async def test_async_main(context, mocker, tmpdir):
@@ -128,6 +169,57 @@ async def test_async_main(context, mocker, tmpdir):
     await worker.async_main(context, {})
 
 
+@pytest.mark.asyncio
+async def test_async_main_reuses_queue(context, mocker):
+    mocker.patch.object(worker, "run_tasks", new=noop_async)
+    credentials = {"clientId": "a", "accessToken": "b"}
+    await worker.async_main(context, credentials)
+    queue = context.queue
+    assert queue is not None
+    await worker.async_main(context, credentials)
+    assert context.queue is queue
+
+
+# main_loop {{{1
+@pytest.mark.asyncio
+async def test_main_loop_reuses_session(context, mocker):
+    sessions = []
+
+    async def async_main(internal_context, _):
+        sessions.append(internal_context.session)
+
+    mocker.patch.object(worker, "async_main", new=async_main)
+    await worker.main_loop(context, {}, lambda: len(sessions) >= 3)
+    assert len(sessions) == 3
+    assert len(set(id(session) for session in sessions)) == 1
+    assert sessions[0].closed
+    assert context.session is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("release_fails", (True, False))
+async def test_main_loop_releases_prefetched_claim_on_error(context, mocker, release_fails):
+    completed = []
+
+    async def async_main(internal_context, _):
+        internal_context.claim_work_future = asyncio.ensure_future(create_async({"tasks": [{}]})())
+        raise ScriptWorkerException("complete_task blew up")
+
+    async def complete_task(_, status):
+        completed.append(status)
+        if release_fails:
+            raise OSError("release blew up too")
+
+    mocker.patch.object(worker, "async_main", new=async_main)
+    mocker.patch.object(worker, "complete_task", new=complete_task)
+    mocker.patch.object(type(context), "claim_task", new=None)
+    with pytest.raises(ScriptWorkerException):
+        await worker.main_loop(context, {}, lambda: False)
+    assert completed == [STATUSES["worker-shutdown"]]
+    assert context.claim_work_future is None
+    assert context.session is None
+
+
 # run_tasks {{{1
 @pytest.mark.asyncio
 @pytest.mark.parametrize("verify_cot", (True, False))
@@ -227,9 +319,22 @@ async def test_mocker_upload_artifacts_uncaught_exception(context, successful_qu
     """Raise an uncaught exception within the run_tasks try/excepts."""
     _mocker_run_tasks_helper(mocker, OSError, "upload_artifacts")
 
+    reclaim_futures = []
+    create_task = context.event_loop.create_task
+
+    def record_create_task(coro):
+        fut = create_task(coro)
+        reclaim_futures.append(fut)
+        return fut
+
+    mocker.patch.object(context.event_loop, "create_task", new=record_create_task)
     context.queue = successful_queue
     with pytest.raises(OSError):
         await worker.run_tasks(context)
+    # the reclaim loop doesn't outlive the task
+    assert len(reclaim_futures) == 1
+    with pytest.raises(asyncio.CancelledError):
+        await reclaim_futures[0]
 
 
 @pytest.mark.asyncio
@@ -245,6 +350,19 @@ async def test_unexpected_exception_catch_and_tell_taskcluster(context, successf
     assert status == STATUSES["internal-error"]
 
 
+@pytest.mark.asyncio
+async def test_do_run_task_generate_cot_exception(context, mocker):
+    """The run_task status isn't lost if generate_cot raises afterwards."""
+
+    def fail(*args, **kwargs):
+        raise ScriptWorkerException("foo")
+
+    mocker.patch.object(worker, "run_task", new=create_async(STATUSES["superseded"]))
+    mocker.patch.object(worker, "generate_cot", new=fail)
+    status = await do_run_task(context, None, None)
+    assert status == STATUSES["superseded"]
+
+
 @pytest.mark.asyncio
 async def test_run_tasks_timeout(context, successful_queue, mocker):
     temp_dir = os.path.join(context.config["work_dir"], "timeout")
@@ -323,6 +441,122 @@ async def test_run_tasks_no_cancel(context, mocker):
     mock_complete_task.assert_called_once_with(mock.ANY, 0)
 
 
+@pytest.mark.asyncio
+async def test_run_tasks_prefetch_claim_work(context, mocker):
+    claim_work_calls = []
+
+    async def claim_work(*args, **kwargs):
+        claim_work_calls.append(args)
+        return _MOCK_CLAIM_WORK_NONE_RETURN if len(claim_work_calls) > 1 else _MOCK_CLAIM_WORK_RETURN
+
+    mocker.patch("scriptworker.worker.claim_work", claim_work)
+    mocker.patch.object(asyncio, "sleep", noop_async)
+    mocker.patch("scriptworker.worker.prepare_to_run_task", noop_sync)
+    mocker.patch("scriptworker.worker.reclaim_task", noop_async)
+    mocker.patch("scriptworker.worker.do_run_task", create_async(0))
+    mocker.patch("scriptworker.worker.cleanup", noop_sync)
+    mocker.patch("scriptworker.worker.filepaths_in_dir", create_sync([]))
+    mocker.patch("scriptworker.worker.do_upload", create_async(0))
+    mocker.patch("scriptworker.worker.complete_task", noop_async)
+
+    assert await RunTasks().invoke(context) == 0
+    # The next claim_work was kicked off before the task was completed
+    assert context.claim_work_future is not None
+    await context.claim_work_future
+    assert len(claim_work_calls) == 2
+    # ... and the next invoke uses it rather than calling claim_work again
+    assert await RunTasks().invoke(context) is None
+    assert context.claim_work_future is None
+    assert len(claim_work_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_no_prefetch_when_draining(context, mocker):
+    claim_work_calls = []
+
+    async def claim_work(*args, **kwargs):
+        claim_work_calls.append(args)
+        return _MOCK_CLAIM_WORK_RETURN
+
+    mocker.patch("scriptworker.worker.claim_work", claim_work)
+
+    async def do_run_task(*args, **kwargs):
+        # e.g. SIGUSR1 arrives while the task is running
+        context.draining = True
+        return 0
+
+    mocker.patch("scriptworker.worker.prepare_to_run_task", noop_sync)
+    mocker.patch("scriptworker.worker.reclaim_task", noop_async)
+    mocker.patch("scriptworker.worker.do_run_task", do_run_task)
+    mocker.patch("scriptworker.worker.cleanup", noop_sync)
+    mocker.patch("scriptworker.worker.filepaths_in_dir", create_sync([]))
+    mocker.patch("scriptworker.worker.do_upload", create_async(0))
+    mocker.patch("scriptworker.worker.complete_task", noop_async)
+
+    assert await RunTasks().invoke(context) == 0
+    assert context.claim_work_future is None
+    assert len(claim_work_calls) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("claim_work_result, expected_calls", ((None, 0), (_MOCK_CLAIM_WORK_NONE_RETURN, 0), ({"tasks": [{}, {}]}, 2)))
+async def test_release_prefetched_claim(context, mocker, claim_work_result, expected_calls):
+    completed = []
+
+    async def complete_task(_, status):
+        completed.append(status)
+
+    mocker.patch.object(worker, "complete_task", new=complete_task)
+    mocker.patch.object(type(context), "claim_task", new=None)
+    await worker.release_prefetched_claim(context)
+    assert completed == []
+
+    context.claim_work_future = asyncio.ensure_future(create_async(claim_work_result)())
+    await worker.release_prefetched_claim(context)
+    assert completed == [STATUSES["worker-shutdown"]] * expected_calls
+    assert context.claim_work_future is None
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_cleanup_in_executor(context, mocker):
+    cleanup_threads = []
+
+    def cleanup(_):
+        cleanup_threads.append(threading.get_ident())
+
+    mocker.patch("scriptworker.worker.claim_work", create_async(_MOCK_CLAIM_WORK_RETURN))
+    mocker.patch("scriptworker.worker.prepare_to_run_task", noop_sync)
+    mocker.patch("scriptworker.worker.reclaim_task", noop_async)
+    mocker.patch("scriptworker.worker.do_run_task", create_async(0))
+    mocker.patch("scriptworker.worker.filepaths_in_dir", create_sync([]))
+    mocker.patch("scriptworker.worker.do_upload", create_async(0))
+    mocker.patch("scriptworker.worker.complete_task", noop_async)
+    mocker.patch("scriptworker.worker.cleanup", cleanup)
+
+    await RunTasks().invoke(context)
+    assert len(cleanup_threads) == 1
+    assert cleanup_threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_run_cancellable():
+    run_tasks = RunTasks()
+
+    async def check():
+        # no new Task is created for the coroutine
+        assert run_tasks.future is asyncio.current_task()
+        return 1
+
+    async def fail():
+        raise OSError("foo")
+
+    assert await run_tasks._run_cancellable(check()) == 1
+    assert run_tasks.future is None
+    with pytest.raises(OSError):
+        await run_tasks._run_cancellable(fail())
+    assert run_tasks.future is None
+
+
 @pytest.mark.asyncio
 async def test_run_tasks_cancel_claim_work(context, mocker):
     async def dont_call_me(*args, **kwargs):